@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import hashlib
 import json
 import os
+import re
 import sys
 from pathlib import Path
 import shutil
@@ -16,17 +18,22 @@ from scripts.lib_normalize import load_inputs_and_normalize
 from scripts.lib_validate import validate_dataset
 from scripts.lib_render import render_markdown
 from scripts.lib_search_index import build_search_index
-from scripts.lib_enrich_urls import (
-    enrich_karaoke_json,
-    build_musixmatch_url,
-    build_google_fallback_url,
-)
+from scripts.lib_layout import build_all_songs_layout
+from scripts.lib_delta import build_delta
+from scripts.lib_enrich_urls import enrich_karaoke_json, enrich_songs
+from scripts.lib_parallel import chunked_pool
 
 
 DATA_DIR = ROOT / "data"
 DIST_DIR = ROOT / "dist"
 INTERNAL_DIR = ROOT / "internal"
 WEB_DIR = ROOT / "web"
+HISTORY_DIR = ROOT / ".build_cache" / "history"
+HISTORY_KEEP = 5
+DIGEST_NAME = "build_digest.json"
+
+# Exit code signalling that outputs are byte-identical to --previous-digest
+EXIT_UNCHANGED = 3
 
 
 def read_categories(path: Path) -> list[str]:
@@ -42,8 +49,62 @@ def read_categories(path: Path) -> list[str]:
 
 def write_json(path: Path, obj: dict | list) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
+    with path.open("w", encoding="utf-8", newline="\n") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def data_version(dataset: dict, search_index: dict) -> str:
+    # Content hash of the songbook (minus meta) and the search index (minus
+    # its version stamp), so it changes whenever either published file does
+    payload = {
+        "songbook": {k: v for k, v in dataset.items() if k != "meta"},
+        "search_index": {k: v for k, v in search_index.items() if k != "data_version"},
+    }
+    canonical = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def _generated_at(deterministic: bool) -> str | None:
+    if not deterministic:
+        return datetime.now(timezone.utc).isoformat()
+    # Reproducible builds convention; omit the timestamp when not provided
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if epoch and epoch.strip().isdigit():
+        return datetime.fromtimestamp(int(epoch), timezone.utc).isoformat()
+    return None
+
+
+def write_digest(out_dir: Path) -> str:
+    """
+    Hash every emitted file (sorted by relative path) and write
+    build_digest.json. Returns the combined digest.
+
+    deltas/ is left out: it depends on the build history (a CI cache that
+    grows, rotates and can be evicted), not on the published catalog, and
+    a history change alone must not trigger a redeploy.
+    """
+    files: dict[str, str] = {}
+    for path in sorted(p for p in out_dir.rglob("*") if p.is_file()):
+        rel = path.relative_to(out_dir).as_posix()
+        if rel == DIGEST_NAME or rel.startswith("deltas/"):
+            continue
+        files[rel] = hashlib.sha256(path.read_bytes()).hexdigest()
+    combined = hashlib.sha256()
+    for rel, h in files.items():
+        combined.update(f"{h}  {rel}\n".encode("utf-8"))
+    digest = combined.hexdigest()
+    write_json(out_dir / DIGEST_NAME, {"digest": digest, "files": files})
+    return digest
+
+
+def read_digest(path: Path) -> str | None:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    digest = data.get("digest") if isinstance(data, dict) else None
+    return digest if isinstance(digest, str) else None
 
 
 def copy_static_frontend(out_dir: Path) -> None:
@@ -51,7 +112,7 @@ def copy_static_frontend(out_dir: Path) -> None:
         return
     out_dir.mkdir(parents=True, exist_ok=True)
     # Copy top-level files (include theme.css from web)
-    for name in ("index.html", "styles.css", "app.js", "theme.css"):
+    for name in ("index.html", "styles.css", "app.js", "sw.js", "theme.css"):
         src = WEB_DIR / name
         if src.exists():
             shutil.copy2(src, out_dir / name)
@@ -75,15 +136,98 @@ def copy_static_frontend(out_dir: Path) -> None:
 
 
 
+_RE_VERSION = re.compile(r"^[0-9a-f]{8,64}$")
+
+
+def read_history_versions() -> list[str]:
+    # Published data versions, newest first
+    try:
+        data = json.loads((HISTORY_DIR / "manifest.json").read_text(encoding="utf-8"))
+    except Exception:
+        return []
+    versions = data.get("versions") if isinstance(data, dict) else None
+    return [v for v in versions or [] if isinstance(v, str) and _RE_VERSION.match(v)]
+
+
+def save_history(version: str, songbook: dict, search_index: dict) -> None:
+    versions = [version] + [v for v in read_history_versions() if v != version]
+    write_json(HISTORY_DIR / version / "songbook.json", songbook)
+    write_json(HISTORY_DIR / version / "search_index.json", search_index)
+    for stale in versions[HISTORY_KEEP:]:
+        shutil.rmtree(HISTORY_DIR / stale, ignore_errors=True)
+    write_json(HISTORY_DIR / "manifest.json", {"versions": versions[:HISTORY_KEEP]})
+
+
+def seed_history(site_dir: Path) -> str | None:
+    """
+    Record the catalog currently published (songbook.json and
+    search_index.json downloaded from the live site into ``site_dir``) in
+    the history, so a lost history cache still yields a delta from the live
+    version. Ignored unless the files hash to their own data_version.
+    """
+    try:
+        songbook = json.loads((site_dir / "songbook.json").read_text(encoding="utf-8"))
+        search_index = json.loads((site_dir / "search_index.json").read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    version = (songbook.get("meta") or {}).get("data_version")
+    if not isinstance(version, str) or not _RE_VERSION.match(version):
+        return None
+    if search_index.get("data_version") != version or data_version(songbook, search_index) != version:
+        return None
+    save_history(version, songbook, search_index)
+    return version
+
+
+def publish_deltas(out_dir: Path, songbook: dict, search_index: dict) -> int:
+    """
+    Emit deltas/<version>.json from each recent published version to the
+    current one, plus deltas/latest.json naming the current version, then
+    record the current version in the history. Returns the delta count.
+    """
+    version = songbook["meta"]["data_version"]
+    deltas_dir = out_dir / "deltas"
+    shutil.rmtree(deltas_dir, ignore_errors=True)
+    count = 0
+    for prev in read_history_versions():
+        if prev == version:
+            continue
+        try:
+            prev_songbook = json.loads((HISTORY_DIR / prev / "songbook.json").read_text(encoding="utf-8"))
+            prev_index = json.loads((HISTORY_DIR / prev / "search_index.json").read_text(encoding="utf-8"))
+        except Exception:
+            continue
+        write_json(deltas_dir / f"{prev}.json", build_delta(prev_songbook, prev_index, songbook, search_index))
+        count += 1
+    write_json(deltas_dir / "latest.json", {"version": version})
+    save_history(version, songbook, search_index)
+    return count
+
+
 def main(argv: list[str] | None = None) -> int:
     argv = argv or sys.argv[1:]
     include_review = False
     internal_mode = False
-    for a in argv:
+    deterministic = False
+    previous_digest: Path | None = None
+    previous_site: Path | None = None
+    workers: int | None = None  # default: one per CPU
+    for i, a in enumerate(argv):
         if a == "--include-review":
             include_review = True
         if a == "--internal":
             internal_mode = True
+        if a == "--deterministic":
+            deterministic = True
+        if a == "--previous-digest" and i + 1 < len(argv):
+            previous_digest = Path(argv[i + 1])
+        if a == "--previous-site" and i + 1 < len(argv):
+            previous_site = Path(argv[i + 1])
+        if a == "--jobs" and i + 1 < len(argv) and argv[i + 1].isdigit():
+            workers = int(argv[i + 1])
+
+    # Read before any output is written: the previous digest may live in out_dir
+    previous = read_digest(previous_digest) if previous_digest is not None else None
 
     out_dir = INTERNAL_DIR if internal_mode else DIST_DIR
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -97,28 +241,34 @@ def main(argv: list[str] | None = None) -> int:
         include_review=include_review and internal_mode,
     )
 
-    # Attach simple meta
-    dataset.setdefault("meta", {})
-    dataset["meta"].update(
-        {
-            "generated_at": datetime.now(timezone.utc).isoformat(),
-            "version": 1,
-        }
-    )
+    # One process pool for all per-song passes (None: serial, small catalogs)
+    with chunked_pool(len(dataset.get("songs", [])), workers) as pool:
+        # Enrich: add lyrics_url and fallback_url to each song (idempotent)
+        enrich_songs(dataset.get("songs", []), pool)
 
-    # Enrich: add lyrics_url and fallback_url to each song (idempotent)
-    for s in dataset.get("songs", []):
-        title = (s.get("title") or "").strip()
-        artist = (s.get("artist") or "").strip()
-        # categories can be list or single string; support both
-        raw_cat = s.get("categories") if isinstance(s.get("categories"), list) else s.get("category")
-        category = raw_cat if isinstance(raw_cat, str) else None
-        categories_list = raw_cat if isinstance(raw_cat, list) else None
+        # Precompute row offsets for the virtualized "All Songs" panel
+        dataset["all_songs"] = build_all_songs_layout(dataset)
 
-        if not s.get("lyrics_url") and title and artist:
-            s["lyrics_url"] = build_musixmatch_url(artist, title)
-        if not s.get("fallback_url") and (title or artist):
-            s["fallback_url"] = build_google_fallback_url(title, artist, category, categories_list)
+        # Build the search index first so data_version covers both catalog files
+        search_index = build_search_index(dataset, pool)
+
+        # Input list with missing lyrics_url/fallback_url added (emitted below)
+        try:
+            enriched = enrich_karaoke_json(DATA_DIR / "karaoke_song_list.json", pool)
+        except Exception as e:
+            # Non-fatal: keep main build successful even if enrichment fails
+            enriched = []
+            print(f"[warn] Enrichment failed: {e}")
+
+    # Attach simple meta; data_version is derived from content, not the clock
+    version = data_version(dataset, search_index)
+    search_index["data_version"] = version
+    meta = {"version": 1, "data_version": version}
+    generated_at = _generated_at(deterministic)
+    if generated_at:
+        meta["generated_at"] = generated_at
+    dataset.setdefault("meta", {})
+    dataset["meta"].update(meta)
 
     # Validate
     report = validate_dataset(dataset, categories)
@@ -128,9 +278,16 @@ def main(argv: list[str] | None = None) -> int:
     write_json(out_dir / "songbook.json", dataset)
 
     # Emit search_index.json
-    search_index = build_search_index(dataset)
     write_json(out_dir / "search_index.json", search_index)
 
+    # Emit deltas from recent public versions (never for internal builds,
+    # which may include songs under review)
+    delta_count = 0
+    if not internal_mode:
+        if previous_site is not None:
+            seed_history(previous_site)
+        delta_count = publish_deltas(out_dir, dataset, search_index)
+
     # Emit songbook.md
     md = render_markdown(dataset, categories)
     (out_dir / "songbook.md").write_text(md, encoding="utf-8")
@@ -141,7 +298,6 @@ def main(argv: list[str] | None = None) -> int:
     # Also emit karaoke_song_list.json with added lyrics_url and fallback_url
     # Idempotent: only adds missing fields without overwriting existing ones
     try:
-        enriched = enrich_karaoke_json(DATA_DIR / "karaoke_song_list.json")
         if enriched:
             write_json(out_dir / "karaoke_song_list.json", enriched)
         # Clean up any legacy enriched filename in output
@@ -155,6 +311,8 @@ def main(argv: list[str] | None = None) -> int:
         # Non-fatal: keep main build successful even if enrichment fails
         print(f"[warn] Enrichment failed: {e}")
 
+    digest = write_digest(out_dir)
+
     target_label = "internal" if internal_mode else "dist"
     print("Built:")
     print(f" - {target_label}/songbook.json")
@@ -169,6 +327,13 @@ def main(argv: list[str] | None = None) -> int:
         print(f" - {target_label}/styles.css")
     if (out_dir / "app.js").exists():
         print(f" - {target_label}/app.js")
+    if (out_dir / "deltas" / "latest.json").exists():
+        print(f" - {target_label}/deltas/ ({delta_count} from previous versions)")
+    print(f" - {target_label}/{DIGEST_NAME} ({digest[:12]})")
+
+    if previous is not None and previous == digest:
+        print("Outputs unchanged since previous build; nothing to deploy.")
+        return EXIT_UNCHANGED
     return 0
 
 
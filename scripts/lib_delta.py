@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from typing import Any
+
+
+def _apply_ordered(prev: list[dict], diff: dict[str, list], key: str) -> list[dict]:
+    # Python twin of applyOrdered in web/sw.js
+    drop = set(diff["removed"]) | {u["item"][key] for u in diff["upserted"]}
+    out = [it for it in prev if it[key] not in drop]
+    for u in diff["upserted"]:
+        out.insert(u["at"], u["item"])
+    return out
+
+
+def _diff_ordered(prev: list[dict], cur: list[dict], key: str) -> dict[str, list]:
+    # Sorted lists keyed by `key`: new or changed items carry their final
+    # position, so the client drops them plus the removed keys, then inserts
+    # in ascending position to reproduce the current order
+    prev_by_key = {it[key]: it for it in prev}
+    cur_keys = {it[key] for it in cur}
+    upserted = [{"at": i, "item": it} for i, it in enumerate(cur) if prev_by_key.get(it[key]) != it]
+    removed = sorted(k for k in prev_by_key if k not in cur_keys)
+    diff = {"upserted": upserted, "removed": removed}
+    # Untouched items that moved relative to each other (e.g. reordered
+    # categories) cannot be expressed this way: resend the whole list
+    if _apply_ordered(prev, diff, key) != cur:
+        diff = {"upserted": [{"at": i, "item": it} for i, it in enumerate(cur)], "removed": sorted(prev_by_key)}
+    return diff
+
+
+def _layout_chunks(layout: dict[str, Any] | None) -> list[dict]:
+    # Rows are cumulative and shift with every insertion; the client
+    # recomputes them, so diff the chunks without them
+    return [{"artist": c["artist"], "songs": c["songs"]} for c in (layout or {}).get("chunks", [])]
+
+
+def _patch(prev: dict[str, Any], cur: dict[str, Any], skip: tuple[str, ...] = ("songs",)) -> dict[str, Any]:
+    # Top-level keys not in skip are replaced wholesale; None drops a key
+    out: dict[str, Any] = {}
+    for k in sorted(set(prev) | set(cur)):
+        if k in skip:
+            continue
+        if k not in cur:
+            out[k] = None
+        elif prev.get(k) != cur[k]:
+            out[k] = cur[k]
+    return out
+
+
+def build_delta(
+    prev_songbook: dict[str, Any],
+    prev_index: dict[str, Any],
+    songbook: dict[str, Any],
+    index: dict[str, Any],
+) -> dict[str, Any]:
+    """
+    Describe how to turn a previously published songbook.json and
+    search_index.json into the current ones: songs and index entries by id,
+    artists by id and the all_songs layout by artist (each as an ordered-list
+    diff that preserves the published order), plus any other top-level keys
+    that changed.
+    """
+    return {
+        "from": (prev_songbook.get("meta") or {}).get("data_version"),
+        "to": (songbook.get("meta") or {}).get("data_version"),
+        "songs": _diff_ordered(prev_songbook.get("songs", []), songbook.get("songs", []), "id"),
+        "index": _diff_ordered(prev_index.get("songs", []), index.get("songs", []), "id"),
+        "artists": _diff_ordered(prev_songbook.get("artists", []), songbook.get("artists", []), "id"),
+        "layout": _diff_ordered(
+            _layout_chunks(prev_songbook.get("all_songs")), _layout_chunks(songbook.get("all_songs")), "artist"
+        ),
+        "patch": {
+            "songbook": _patch(prev_songbook, songbook, skip=("songs", "artists", "all_songs")),
+            "index": _patch(prev_index, index),
+        },
+    }
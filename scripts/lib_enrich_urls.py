@@ -3,9 +3,12 @@ from __future__ import annotations
 import json
 import re
 import unicodedata
+from concurrent.futures import Executor
 from pathlib import Path
 from urllib.parse import urlencode
 
+from scripts.lib_parallel import map_chunked
+
 
 def _ascii_strip_accents(s: str) -> str:
     if not isinstance(s, str):
@@ -100,7 +103,53 @@ def _pick_first(d: dict, keys: list[str]) -> str | None:
     return None
 
 
-def enrich_karaoke_json(input_path: Path) -> list[dict]:
+# (title, artist, raw category, needs lyrics_url, needs fallback_url)
+UrlInputs = tuple[str, str, "str | list | None", bool, bool]
+
+
+def _missing_urls(inputs: UrlInputs) -> tuple[str | None, str | None]:
+    # Worker-side: only the fields the URL builders read go in, only the
+    # built URLs come back
+    title, artist, raw_cat, need_lyrics, need_fallback = inputs
+    category = raw_cat if isinstance(raw_cat, str) else None
+    categories_list = raw_cat if isinstance(raw_cat, list) else None
+
+    lyrics = fallback = None
+    if need_lyrics and title and artist:
+        lyrics = build_musixmatch_url(artist, title)
+    if need_fallback and (title or artist):
+        fallback = build_google_fallback_url(title, artist, category, categories_list)
+    return lyrics, fallback
+
+
+def _fill_urls(records: list[dict], inputs: list[UrlInputs], pool: Executor | None) -> None:
+    # Skip records that already have both URLs, merge results in the parent
+    todo = [i for i, inp in enumerate(inputs) if inp[3] or inp[4]]
+    results = map_chunked(_missing_urls, [inputs[i] for i in todo], pool)
+    for i, (lyrics, fallback) in zip(todo, results):
+        if lyrics is not None:
+            records[i]["lyrics_url"] = lyrics
+        if fallback is not None:
+            records[i]["fallback_url"] = fallback
+
+
+def enrich_songs(songs: list[dict], pool: Executor | None = None) -> list[dict]:
+    """
+    Fill missing 'lyrics_url' and 'fallback_url' on normalized songs in
+    place. Existing values are kept.
+    """
+    inputs: list[UrlInputs] = []
+    for s in songs:
+        title = (s.get("title") or "").strip()
+        artist = (s.get("artist") or "").strip()
+        # categories can be list or single string; support both
+        raw_cat = s.get("categories") if isinstance(s.get("categories"), list) else s.get("category")
+        inputs.append((title, artist, raw_cat, not s.get("lyrics_url"), not s.get("fallback_url")))
+    _fill_urls(songs, inputs, pool)
+    return songs
+
+
+def enrich_karaoke_json(input_path: Path, pool: Executor | None = None) -> list[dict]:
     """
     Load karaoke_song_list.json (list of dicts) and return a new list with
     missing fields 'lyrics_url' and 'fallback_url' added, without overwriting
@@ -112,22 +161,11 @@ def enrich_karaoke_json(input_path: Path) -> list[dict]:
     if not isinstance(items, list):
         return []
 
-    out: list[dict] = []
-    for item in items:
-        if not isinstance(item, dict):
-            continue
-        rec = dict(item)
+    out = [dict(item) for item in items if isinstance(item, dict)]
+    inputs: list[UrlInputs] = []
+    for rec in out:
         title = _pick_first(rec, ["name", "title", "song"]) or ""
         artist = _pick_first(rec, ["artist", "singer", "band"]) or ""
-        raw_cat = rec.get("category")
-        category = raw_cat if isinstance(raw_cat, str) else None
-        categories_list = raw_cat if isinstance(raw_cat, list) else None
-
-        if not rec.get("lyrics_url") and title and artist:
-            rec["lyrics_url"] = build_musixmatch_url(artist, title)
-
-        if not rec.get("fallback_url") and (title or artist):
-            rec["fallback_url"] = build_google_fallback_url(title, artist, category, categories_list)
-
-        out.append(rec)
+        inputs.append((title, artist, rec.get("category"), not rec.get("lyrics_url"), not rec.get("fallback_url")))
+    _fill_urls(out, inputs, pool)
     return out
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from typing import Any
+
+from scripts.lib_normalize import _normalize_text
+
+
+def _sort_key(s: str) -> tuple[str, str]:
+    # Same normalization as the rest of the build, raw string as tie-breaker
+    return (_normalize_text(s or ""), s or "")
+
+
+def build_all_songs_layout(dataset: dict[str, Any]) -> dict[str, Any]:
+    """
+    Precompute the row layout of the "All Songs" panel (artist -> songs).
+
+    Every artist header and every song occupies one row. Each chunk holds the
+    row index of its artist header; its songs follow on the next rows in
+    order, so song ``i`` of a chunk sits at ``chunk["row"] + 1 + i``. The
+    client mounts only the visible rows and jumps straight to a row.
+    """
+    by_artist: dict[str, list[dict]] = {}
+    for s in dataset.get("songs", []):
+        artist = s.get("artist") or "Unknown"
+        by_artist.setdefault(artist, []).append(s)
+
+    chunks: list[dict[str, Any]] = []
+    row = 0
+    for artist in sorted(by_artist.keys(), key=_sort_key):
+        songs = sorted(by_artist[artist], key=lambda x: _sort_key(x.get("title") or ""))
+        chunks.append({
+            "artist": artist,
+            "row": row,
+            "songs": [s.get("id") or "" for s in songs],
+        })
+        row += 1 + len(songs)
+
+    return {"rows": row, "chunks": chunks}
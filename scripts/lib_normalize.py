@@ -113,7 +113,7 @@ def _build_artists(songs: list[dict]) -> list[dict]:
         if slug not in by_slug:
             by_slug[slug] = {"id": f"artist:{slug}", "name": name, "slug": slug}
     artists = list(by_slug.values())
-    artists.sort(key=lambda x: _normalize_text(x["name"]))
+    artists.sort(key=lambda x: (_normalize_text(x["name"]), x["slug"]))
     return artists
 
 
@@ -163,6 +163,7 @@ def load_inputs_and_normalize(
                 ),
                 _normalize_text(s.get("artist", "")),
                 _normalize_text(s.get("title", "")),
+                s["id"],
             ),
         ),
     }
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Iterable, Iterator
+
+# Measured per song on a 60k-song catalog, with workers sent only the fields
+# they read: URL enrichment does ~63 µs of work against ~3 µs of pickling
+# round trip, the search index entry ~86 µs against ~25 µs (the returned
+# entry itself is ~22 µs of that), and starting the pool costs ~0.15 s. The
+# parent does all that pickling serially, so the index pass cannot speed up
+# by more than ~3x whatever the worker count. With 8 workers the pool
+# breaks even around 2-3k songs; below this it costs more than it saves.
+# Validation (~6 µs per song) is cheaper than its own pickling and stays
+# serial at any size.
+SERIAL_THRESHOLD = 4000
+# Items per task: tens of ms of work each, so IPC per task is negligible
+# while there are still enough tasks to balance 8 workers
+CHUNK_SIZE = 250
+
+
+def _run_chunk(fn: Callable[[Any], Any], chunk: list) -> list:
+    return [fn(x) for x in chunk]
+
+
+def resolve_workers(workers: int | None) -> int:
+    if workers is None:
+        return os.cpu_count() or 1
+    return max(1, workers)
+
+
+@contextmanager
+def chunked_pool(n_items: int, workers: int | None = None) -> Iterator[Executor | None]:
+    """
+    One process pool shared by all per-song passes of a build. Yields None
+    (serial) for catalogs under SERIAL_THRESHOLD or a single worker.
+    """
+    workers = resolve_workers(workers)
+    if workers <= 1 or n_items < SERIAL_THRESHOLD:
+        yield None
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield pool
+
+
+def map_chunked(fn: Callable[[Any], Any], items: Iterable, pool: Executor | None = None) -> list:
+    """
+    Apply ``fn`` to every item, in batches of CHUNK_SIZE on ``pool``.
+    Results come back in input order, so output is the same as the serial
+    ``[fn(x) for x in items]``. ``fn`` must be picklable (a module-level
+    function or a functools.partial of one). Runs serially without a pool
+    or for fewer than SERIAL_THRESHOLD items.
+    """
+    items = list(items)
+    if pool is None or len(items) < SERIAL_THRESHOLD:
+        return [fn(x) for x in items]
+
+    chunks = [items[i : i + CHUNK_SIZE] for i in range(0, len(items), CHUNK_SIZE)]
+    out: list = []
+    for part in pool.map(partial(_run_chunk, fn), chunks):
+        out.extend(part)
+    return out
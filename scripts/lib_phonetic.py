@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Iterable
+
+# Metaphone-style phonetic keys. Each language first rewrites its spelling
+# conventions; the first letter is kept as-is (vowels as "A") and the rest
+# collapse into consonant classes (b/f/p/v, c/g/k/q, d/t, s/z) with vowels
+# dropped, so "rapsody", "rhapsody" and "despasito", "despacito" share a key.
+# Keys shorter than MIN_KEY_LEN match too broadly and are not emitted.
+# web/app.js mirrors these rules for queries; keep both in sync.
+
+_RULES: dict[str, list[tuple[re.Pattern, str]]] = {
+    "en": [
+        (re.compile(p), r)
+        for p, r in (
+            (r"x", "ks"), (r"^kn", "n"), (r"^wr", "r"), (r"ph", "f"), (r"ck", "k"), (r"sch", "sk"),
+            (r"tch", "x"), (r"sh", "x"), (r"ch", "x"), (r"th", "t"), (r"gh", ""),
+            (r"dg(?=[eiy])", "j"), (r"c(?=[eiy])", "s"), (r"q", "k"),
+        )
+    ],
+    "es": [
+        (re.compile(p), r)
+        for p, r in (
+            (r"ll", "y"), (r"lh", "y"), (r"nh", "n"), (r"ch", "x"), (r"qu", "k"),
+            (r"g(?=[ei])", "j"), (r"gu(?=[ei])", "g"), (r"c(?=[ei])", "s"), (r"z", "s"),
+            (r"j", "h"), (r"h", ""),
+        )
+    ],
+    "it": [
+        (re.compile(p), r)
+        for p, r in (
+            (r"gli", "li"), (r"gn", "n"), (r"sc(?=[ei])", "x"), (r"ch", "k"), (r"gh", "g"),
+            (r"c(?=[ei])", "x"), (r"g(?=[ei])", "j"), (r"z", "s"), (r"h", ""),
+        )
+    ],
+}
+
+_CLASSES = {
+    "b": "P", "f": "P", "p": "P", "v": "P",
+    "c": "K", "g": "K", "k": "K", "q": "K",
+    "d": "T", "t": "T",
+    "s": "S", "z": "S",
+    "x": "X", "j": "J", "l": "L", "r": "R", "m": "M", "n": "N",
+}
+
+LANGS = tuple(_RULES)
+MIN_KEY_LEN = 3
+
+
+def _words(s: str) -> list[str]:
+    s = unicodedata.normalize("NFKD", s or "")
+    s = "".join(ch for ch in s if not unicodedata.combining(ch)).lower()
+    return re.findall(r"[a-z0-9]+", s)
+
+
+def phonetic_key(word: str, lang: str = "en") -> str:
+    w = word
+    for pat, rep in _RULES.get(lang, _RULES["en"]):
+        w = pat.sub(rep, w)
+    if not w:
+        return ""
+    out = "A" if w[0] in "aeiou" else w[0].upper()
+    prev = _CLASSES.get(w[0], "")
+    for ch in w[1:]:
+        code = _CLASSES.get(ch, "")
+        if code and code != prev:
+            out += code
+        prev = code
+    return out
+
+
+def lang_for_categories(categories: Iterable[str]) -> str:
+    # Same hints as _query_keyword_for_category, matched loosely so that
+    # "Latin Beats" counts as Latin
+    cats = " ".join(c for c in categories if isinstance(c, str)).lower()
+    if "latin" in cats or "portuguese" in cats or "spanish" in cats:
+        return "es"
+    if "italian" in cats:
+        return "it"
+    return "en"
+
+
+def phonetic_keys(text: str, langs: Iterable[str]) -> list[str]:
+    """
+    Distinct keys (at least MIN_KEY_LEN symbols) of every word in ``text`` under each
+    of ``langs``, in first-seen order.
+    """
+    out: list[str] = []
+    seen: set[str] = set()
+    for word in _words(text):
+        for lang in langs:
+            k = phonetic_key(word, lang)
+            if len(k) >= MIN_KEY_LEN and k not in seen:
+                seen.add(k)
+                out.append(k)
+    return out
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+from concurrent.futures import Executor
 from typing import Any, Iterable
 
+from scripts.lib_parallel import map_chunked
+from scripts.lib_phonetic import lang_for_categories, phonetic_keys
+
 
 def _norm(s: str) -> str:
     try:
@@ -28,33 +32,43 @@ def _trigrams(s: str) -> list[str]:
     return uniq
 
 
-def build_search_index(dataset: dict[str, Any]) -> dict[str, Any]:
-    # Produce a compact index for client fuzzy search
-    entries: list[dict[str, Any]] = []
-    for s in dataset.get("songs", []):
-        title = (s.get("title") or "").strip()
-        artist = (s.get("artist") or "").strip()
-        categories = []
-        if isinstance(s.get("categories"), list):
-            categories = [c.strip() for c in s.get("categories") if isinstance(c, str) and c.strip()]
-        else:
-            c = (s.get("category") or "Uncategorized").strip()
-            if c:
-                categories = [c]
-        nid = s.get("id") or ""
-
-        nt = _norm(title)
-        na = _norm(artist)
-        nc = _norm(" ".join(categories))
-        hay = f"{nt} {na} {nc}"
-        grams = _trigrams(hay)
-
-        entries.append({
-            "id": nid,
-            "t": nt,  # normalized title
-            "a": na,  # normalized artist
-            "c": nc,  # normalized categories (joined)
-            "g": grams,  # trigrams
-        })
+def _entry_inputs(s: dict[str, Any]) -> tuple[str, str, str, list[str]]:
+    # Only the fields an entry is built from are shipped to workers
+    title = (s.get("title") or "").strip()
+    artist = (s.get("artist") or "").strip()
+    categories = []
+    if isinstance(s.get("categories"), list):
+        categories = [c.strip() for c in s.get("categories") if isinstance(c, str) and c.strip()]
+    else:
+        c = (s.get("category") or "Uncategorized").strip()
+        if c:
+            categories = [c]
+    return (s.get("id") or "", title, artist, categories)
+
+
+def _build_entry(inputs: tuple[str, str, str, list[str]]) -> dict[str, Any]:
+    nid, title, artist, categories = inputs
 
+    nt = _norm(title)
+    na = _norm(artist)
+    nc = _norm(" ".join(categories))
+    hay = f"{nt} {na} {nc}"
+    grams = _trigrams(hay)
+    # Phonetic keys under English rules plus the category's language
+    langs = dict.fromkeys(("en", lang_for_categories(categories)))
+
+    return {
+        "id": nid,
+        "t": nt,  # normalized title
+        "a": na,  # normalized artist
+        "c": nc,  # normalized categories (joined)
+        "g": grams,  # trigrams
+        "pt": phonetic_keys(title, langs),  # title phonetic keys
+        "pa": phonetic_keys(artist, langs),  # artist phonetic keys
+    }
+
+
+def build_search_index(dataset: dict[str, Any], pool: Executor | None = None) -> dict[str, Any]:
+    # Produce a compact index for client fuzzy search
+    entries = map_chunked(_build_entry, [_entry_inputs(s) for s in dataset.get("songs", [])], pool)
     return {"version": 1, "songs": entries}
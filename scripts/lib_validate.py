@@ -32,6 +32,9 @@ def validate_dataset(dataset: dict[str, Any], categories: list[str]) -> dict:
                     }
                 )
 
+    # Stable order regardless of song order in the inputs
+    issues.sort(key=lambda i: (str(i.get("id") or ""), i["field"], i["error"], str(i.get("value") or "")))
+
     return {
         "summary": {
             "songs": len(dataset.get("songs", [])),
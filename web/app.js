@@ -34,8 +34,91 @@
 
   // Helpers
   function clear(el) { while (el && el.firstChild) el.removeChild(el.firstChild); }
+  function songItem(s) {
+    const li=document.createElement('li');
+    li.className='song-item';
+    li.dataset.songId=s.id;
+    const primary = s.lyrics_url || '';
+    const fallback = s.fallback_url || '';
+    const href = primary || fallback || '#';
+    const titleHtml = (href && href !== '#')
+      ? `<a class="song-link" href="${href}" target="_blank" rel="noopener noreferrer">${s.title}</a>`
+      : `${s.title}`;
+    li.innerHTML = `${titleHtml}`;
+    return li;
+  }
   async function fetchWithRetry(url, tries = 2) { let last; for (let i=0;i<tries;i++){ try{ const r=await fetch(url,{cache:'no-store'}); if(!r.ok) throw new Error('HTTP '+r.status); return await r.json(); } catch(e){ last=e; } } throw last||new Error('Failed'); }
 
+  // Virtualized "All Songs" list: one fixed-height row per artist header or
+  // song, laid out from build-emitted chunk offsets (songbook.json all_songs)
+  let allSongs = null; // { details, mount, list } for the All Songs panel
+  const OVERSCAN = 8;
+  function createVirtualList(layout, songs) {
+    const byId = new Map(songs.map((s) => [s.id, s]));
+    const rows = new Array(layout.rows || 0);
+    const rowOf = new Map();
+    const artistRow = new Map();
+    for (const c of layout.chunks) {
+      rows[c.row] = { artist: c.artist };
+      artistRow.set(c.artist, c.row);
+      (c.songs || []).forEach((id, i) => { rows[c.row + 1 + i] = { id }; rowOf.set(id, c.row + 1 + i); });
+    }
+    const el = document.createElement('div'); el.className = 'vlist';
+    el.style.setProperty('--vl-rows', String(rows.length));
+    const ul = document.createElement('ul'); ul.className = 'songs vlist-window';
+    el.appendChild(ul);
+    let start = -1, end = -1, frame = 0, highlightRow = -1, highlightTimer = 0;
+    const rowHeight = () => parseFloat(getComputedStyle(el).getPropertyValue('--row-h')) || 44;
+    const renderRow = (r) => {
+      const row = rows[r] || {};
+      let li;
+      if (row.id != null) {
+        const s = byId.get(row.id);
+        if (s) li = songItem(s);
+        else { li = document.createElement('li'); li.className = 'song-item'; li.dataset.songId = row.id; }
+      } else {
+        li = document.createElement('li'); li.className = 'artist-header'; li.textContent = `${row.artist || ''}`;
+      }
+      if (r === highlightRow) li.classList.add('highlight');
+      return li;
+    };
+    const update = (force) => {
+      frame = 0;
+      const h = rowHeight();
+      const top = el.getBoundingClientRect().top;
+      const s = Math.max(0, Math.floor(-top / h) - OVERSCAN);
+      const e = Math.max(s, Math.min(rows.length, Math.ceil((window.innerHeight - top) / h) + OVERSCAN));
+      if (!force && s === start && e === end) return;
+      start = s; end = e;
+      ul.style.setProperty('--vl-start', String(start));
+      const frag = document.createDocumentFragment();
+      for (let r = start; r < end; r++) frag.appendChild(renderRow(r));
+      clear(ul); ul.appendChild(frag);
+    };
+    const schedule = () => { if (!frame) frame = requestAnimationFrame(() => update(false)); };
+    const scrollToRow = (r) => {
+      const h = rowHeight();
+      const y = window.scrollY + el.getBoundingClientRect().top + r * h - (window.innerHeight - h) / 2;
+      highlightRow = r;
+      clearTimeout(highlightTimer);
+      highlightTimer = setTimeout(() => { highlightRow = -1; for (const li of ul.querySelectorAll('.highlight')) li.classList.remove('highlight'); }, 3000);
+      window.scrollTo({ top: Math.max(0, y), behavior: 'smooth' });
+      update(true);
+    };
+    window.addEventListener('scroll', schedule, { passive: true });
+    window.addEventListener('resize', schedule, { passive: true });
+    requestAnimationFrame(() => update(true));
+    return {
+      el, rowOf, artistRow, scrollToRow,
+      destroy() {
+        window.removeEventListener('scroll', schedule);
+        window.removeEventListener('resize', schedule);
+        if (frame) cancelAnimationFrame(frame);
+        clearTimeout(highlightTimer);
+      },
+    };
+  }
+
   // Render main accordion (Category → Artist → Songs)
   function render(data) {
     const cats = data.categories || [];
@@ -52,6 +135,8 @@
     }
     for (const [, amap] of byCat) for (const [, arr] of amap) arr.sort((x,y)=>collator.compare(x.title||'', y.title||''));
 
+    if (allSongs && allSongs.list) allSongs.list.destroy();
+    allSongs = null;
     clear(app);
     const openSet = getOpenSet();
 
@@ -71,30 +156,29 @@
       const totalArtists = byArtist.size;
       const summary = document.createElement('summary'); summary.className='summary'; summary.setAttribute('aria-controls','sect-all'); summary.setAttribute('aria-expanded',String(details.open)); summary.textContent = 'All Songs';
       details.appendChild(summary);
+      const layout = data.all_songs && Array.isArray(data.all_songs.chunks) ? data.all_songs : null;
       const mountChildren = () => {
-        if (details.querySelector('ul.songs')) return;
+        if (layout) {
+          // Windowed mode: mount only visible rows from build-emitted offsets
+          if (!allSongs.list) { allSongs.list = createVirtualList(layout, songs); details.appendChild(allSongs.list.el); }
+          return allSongs.list;
+        }
+        if (details.querySelector('ul.songs')) return null;
         const artists=Array.from(byArtist.keys()).sort(collator.compare);
         for(const artist of artists){
           const list=byArtist.get(artist)||[];
           const ul=document.createElement('ul'); ul.className='songs';
           const ah=document.createElement('li'); ah.className='artist-header'; ah.textContent=`${artist}`; ul.appendChild(ah);
-          for(const s of list){
-            const li=document.createElement('li');
-            li.className='song-item';
-            li.dataset.songId=s.id;
-            const primary = s.lyrics_url || '';
-            const fallback = s.fallback_url || '';
-            const href = primary || fallback || '#';
-            const titleHtml = (href && href !== '#')
-              ? `<a class="song-link" href="${href}" target="_blank" rel="noopener noreferrer">${s.title}</a>`
-              : `${s.title}`;
-            li.innerHTML = `${titleHtml}`;
-            ul.appendChild(li);
-          }
+          for(const s of list) ul.appendChild(songItem(s));
           details.appendChild(ul);
         }
+        return null;
       };
-      const unmountChildren = () => { for (const ul of details.querySelectorAll('ul.songs')) ul.remove(); };
+      const unmountChildren = () => {
+        if (allSongs.list) { allSongs.list.destroy(); allSongs.list.el.remove(); allSongs.list = null; }
+        for (const ul of details.querySelectorAll('ul.songs')) ul.remove();
+      };
+      allSongs = { details, mount: mountChildren, list: null };
       details.addEventListener('toggle',()=>{ summary.setAttribute('aria-expanded',String(details.open)); const set=getOpenSet(); if(details.open){ set.add('__ALL__'); saveOpenSet(set); mountChildren(); } else { set.delete('__ALL__'); saveOpenSet(set); unmountChildren(); } });
       if (details.open) mountChildren();
       app.appendChild(details);
@@ -118,6 +202,13 @@
     closePanel();
     if (!window.__DATA__) return;
     const s = window.__DATA__.songs.find(x=>x.id===songId); if(!s) return;
+    if (allSongs) {
+      // Windowed mode: jump straight to the precomputed row
+      if (!allSongs.details.open) allSongs.details.open = true;
+      const list = allSongs.mount();
+      const row = list ? list.rowOf.get(songId) : undefined;
+      if (row != null) { list.scrollToRow(row); return; }
+    }
     const all = document.getElementById('all-songs');
     if (all) {
       if (!all.open) all.open = true; // mounts children via toggle listener
@@ -157,6 +248,12 @@
     closePanel();
     const data = window.__DATA__;
     if(!data) return;
+    if (allSongs) {
+      if (!allSongs.details.open) allSongs.details.open = true;
+      const list = allSongs.mount();
+      const row = list ? list.artistRow.get(artistName) : undefined;
+      if (row != null) { list.scrollToRow(row); return; }
+    }
     const all = document.getElementById('all-songs');
     if (all) {
       if (!all.open) all.open = true; // mounts children via toggle listener
@@ -218,6 +315,27 @@
   function trigrams(s){ const t=`  ${s}  `; const a=[]; for(let i=0;i<t.length-2;i++) a.push(t.slice(i,i+3)); return Array.from(new Set(a)); }
   function jaccard(a,b){ const A=new Set(a),B=new Set(b); let inter=0; for(const x of A) if(B.has(x)) inter++; const uni=A.size+B.size-inter||1; return inter/uni; }
   function dlev(a,b){ const al=a.length, bl=b.length; if(!al) return bl; if(!bl) return al; const dp=Array.from({length:al+1},()=>new Array(bl+1).fill(0)); for(let i=0;i<=al;i++) dp[i][0]=i; for(let j=0;j<=bl;j++) dp[0][j]=j; for(let i=1;i<=al;i++){ for(let j=1;j<=bl;j++){ const cost=a[i-1]===b[j-1]?0:1; dp[i][j]=Math.min(dp[i-1][j]+1, dp[i][j-1]+1, dp[i-1][j-1]+cost); if(i>1&&j>1&&a[i-1]===b[j-2]&&a[i-2]===b[j-1]) dp[i][j]=Math.min(dp[i][j], dp[i-2][j-2]+cost); } } return dp[al][bl]; }
+  // ===== Phonetic keys (mirror of scripts/lib_phonetic.py; keep in sync) =====
+  const PHONETIC_RULES = {
+    en: [[/x/g,'ks'],[/^kn/g,'n'],[/^wr/g,'r'],[/ph/g,'f'],[/ck/g,'k'],[/sch/g,'sk'],[/tch/g,'x'],[/sh/g,'x'],[/ch/g,'x'],[/th/g,'t'],[/gh/g,''],[/dg(?=[eiy])/g,'j'],[/c(?=[eiy])/g,'s'],[/q/g,'k']],
+    es: [[/ll/g,'y'],[/lh/g,'y'],[/nh/g,'n'],[/ch/g,'x'],[/qu/g,'k'],[/g(?=[ei])/g,'j'],[/gu(?=[ei])/g,'g'],[/c(?=[ei])/g,'s'],[/z/g,'s'],[/j/g,'h'],[/h/g,'']],
+    it: [[/gli/g,'li'],[/gn/g,'n'],[/sc(?=[ei])/g,'x'],[/ch/g,'k'],[/gh/g,'g'],[/c(?=[ei])/g,'x'],[/g(?=[ei])/g,'j'],[/z/g,'s'],[/h/g,'']],
+  };
+  const PHONETIC_CLASSES = { b:'P', f:'P', p:'P', v:'P', c:'K', g:'K', k:'K', q:'K', d:'T', t:'T', s:'S', z:'S', x:'X', j:'J', l:'L', r:'R', m:'M', n:'N' };
+  const PHONETIC_BONUS = 0.25;
+  const PHONETIC_MIN_KEY = 3;      // shorter keys match too broadly
+  const PHONETIC_MIN_SIM = 0.6;    // relaxed edit similarity for phonetic hits
+  function phoneticKey(word, lang){ let w=word; for(const [re,rep] of PHONETIC_RULES[lang]) w=w.replace(re,rep); if(!w) return ''; let out='aeiou'.includes(w[0])?'A':w[0].toUpperCase(); let prev=PHONETIC_CLASSES[w[0]]||''; for(const ch of w.slice(1)){ const code=PHONETIC_CLASSES[ch]||''; if(code&&code!==prev) out+=code; prev=code; } return out; }
+  // Posting lists (key → song ids) built once per loaded index from the per-entry keys
+  let postingsFor = null, postings = null;
+  function getPostings(){ const idx=window.__INDEX__; if(postings && postingsFor===idx) return postings; postingsFor=idx; const pt=new Map(), pa=new Map(), artistKeys=new Map(), artistOf=new Map(); const add=(m,k,id)=>{ let a=m.get(k); if(!a) m.set(k,a=[]); a.push(id); }; for(const e of (idx && Array.isArray(idx.songs) ? idx.songs : [])){ for(const k of e.pt||[]) add(pt,k,e.id); for(const k of e.pa||[]) add(pa,k,e.id); artistKeys.set(e.id, (e.pa||[]).length); } for(const s of (window.__DATA__?.songs||[])) artistOf.set(s.id, (s.artist||'').trim()); postings={ pt, pa, artistKeys, artistOf }; return postings; }
+  // Songs/artists whose keys cover every keyed query word (hash lookups only).
+  // An artist also needs the query to cover at least half of its keys, so one
+  // shared word does not make it a hit.
+  function phoneticHits(query){ const { pt, pa, artistKeys, artistOf }=getPostings(); let songs=null, artistSongs=null, keyed=0; for(const word of norm(query).split(' ')){ const keys=new Set(); for(const lang of Object.keys(PHONETIC_RULES)){ const k=phoneticKey(word, lang); if(k.length>=PHONETIC_MIN_KEY) keys.add(k); } if(!keys.size) continue; keyed++; const s=new Set(), a=new Set(); for(const k of keys){ for(const id of pt.get(k)||[]) s.add(id); for(const id of pa.get(k)||[]){ s.add(id); a.add(id); } } songs = songs ? new Set([...songs].filter(x=>s.has(x))) : s; artistSongs = artistSongs ? new Set([...artistSongs].filter(x=>a.has(x))) : a; } const artists=new Set(); for(const id of artistSongs||[]) if(keyed*2 >= (artistKeys.get(id)||0)) artists.add(artistOf.get(id)); return { songs: songs||new Set(), artists }; }
+  // Phonetic hits skip the hard filter but each query word (3+ chars) must
+  // still loosely resemble some word of the text
+  function relaxedMatch(nq,t){ const words=t.split(' ').filter(Boolean); for(const w of nq.split(' ')){ if(w.length<3) continue; let best=0; for(const x of words){ const sim=1 - dlev(w,x)/Math.max(w.length, x.length); if(sim>best) best=sim; } if(best<PHONETIC_MIN_SIM) return false; } return true; }
   function passesHardFilter(q,t){ const nq=norm(q), nt=norm(t); const L=nq.length; if(L===0||nt.length===0) return false; const substr=nt.includes(nq); const tj=jaccard(trigrams(nq), trigrams(nt)); const edn=1 - dlev(nq,nt)/Math.max(nq.length, nt.length); if(L<=3) return substr||tj>=0.60||edn>=0.85; if(L<=6) return substr||tj>=0.45||edn>=0.80; return substr||tj>=0.40||edn>=0.78; }
   function scoreHit(q,t){ const nq=norm(q), nt=norm(t); const substr=nt.includes(nq)?1:0; const tj=jaccard(trigrams(nq), trigrams(nt)); const edn=1 - dlev(nq,nt)/Math.max(nq.length, nt.length); return substr*0.55 + tj*0.30 + edn*0.15; }
 
@@ -225,7 +343,7 @@
   function findArtist(id){ const s=(window.__DATA__?.songs||[]).find(x=>x.id===id); return s?.artist||''; }
   function getSongItems(){ if(window.__INDEX__ && Array.isArray(window.__INDEX__.songs)){ return window.__INDEX__.songs.map(s=>({ type:'song', id:s.id, label:`${(findTitle(s.id)||'').trim()} — ${(findArtist(s.id)||'').trim()}`, value: norm(`${s.t||''} ${s.a||''} ${s.c||''}`) })); } const out=[]; for(const s of (window.__DATA__?.songs||[])){ const cats = Array.isArray(s.categories)? s.categories.join(' ') : (s.category||''); out.push({ type:'song', id:s.id, label:`${s.title||''} — ${s.artist||''}`, value: norm(`${s.title||''} ${s.artist||''} ${cats}`) }); } return out; }
   function getArtistItems(){ const seen=new Set(); const items=[]; for(const s of (window.__DATA__?.songs||[])){ const a=(s.artist||'').trim(); if(!a||seen.has(a)) continue; seen.add(a); items.push({ type:'artist', artist:a, label:a, value:norm(a) }); } return items; }
-  function searchHits(query, items){ const nq=norm(query); if(!nq) return []; const arr=[]; for(const it of items){ const text=it.value||norm(it.label||''); if(!passesHardFilter(nq, text)) continue; const score=scoreHit(nq, text); arr.push({...it, score}); } arr.sort((a,b)=>b.score-a.score); return arr; }
+  function searchHits(query, items, phon){ const nq=norm(query); if(!nq) return []; const arr=[]; for(const it of items){ const text=it.value||norm(it.label||''); const phonHit = !!phon && (it.type==='artist' ? phon.artists.has(it.artist) : phon.songs.has(it.id)) && relaxedMatch(nq, text); if(!phonHit && !passesHardFilter(nq, text)) continue; const score=scoreHit(nq, text) + (phonHit ? PHONETIC_BONUS : 0); arr.push({...it, score}); } arr.sort((a,b)=>b.score-a.score); return arr; }
 
   function renderPanel(results){ currentResults=results; clear(panel); if(!results.length) return; const box=document.createElement('div'); box.className='panel'; const list=document.createElement('div'); list.className='list'; list.setAttribute('role','listbox'); results.forEach((r,i)=>{ const opt=document.createElement('div'); opt.className='item'; opt.setAttribute('role','option'); opt.id=`opt-${i}`; opt.dataset.index=String(i); if(r.type==='artist'){ opt.dataset.kind='artist'; opt.textContent=r.label||''; } else { opt.dataset.kind='song'; opt.dataset.id=r.id||''; opt.textContent=r.label||''; } list.appendChild(opt); }); box.appendChild(list); panel.appendChild(box); setActive(0); }
   function setActive(i){ const list=panel.querySelector('[role="listbox"]'); if(!list) return; const items=Array.from(list.querySelectorAll('[role="option"]')); if(!items.length) return; activeIndex=Math.max(0, Math.min(i, items.length-1)); items.forEach((el,idx)=>{ el.setAttribute('aria-selected', String(idx===activeIndex)); el.classList.toggle('active', idx===activeIndex); }); const activeEl=items[activeIndex]; if(activeEl) search?.setAttribute('aria-activedescendant', activeEl.id); }
@@ -249,7 +367,7 @@
   function closeIfOutside(e){ // Close on click/tap outside
     const t=e.target; if(t===search || panel.contains(t) || search.contains(t)) return; closePanel();
   }
-  const runSearch = debounce(()=>{ const q=search.value||''; if(q.trim().length===0){ clear(panel); currentResults=[]; closePanel(); return; } const arts=searchHits(q, getArtistItems()); const songs=searchHits(q, getSongItems()); const combined=[...arts.slice(0,5), ...songs.slice(0, Math.max(0, 8-arts.slice(0,5).length))]; if(!combined.length){ clear(panel); closePanel(); return; } renderPanel(combined); openPanel(); }, 140);
+  const runSearch = debounce(()=>{ const q=search.value||''; if(q.trim().length===0){ clear(panel); currentResults=[]; closePanel(); return; } const phon=phoneticHits(q); const arts=searchHits(q, getArtistItems(), phon); const songs=searchHits(q, getSongItems(), phon); const combined=[...arts.slice(0,5), ...songs.slice(0, Math.max(0, 8-arts.slice(0,5).length))]; if(!combined.length){ clear(panel); closePanel(); return; } renderPanel(combined); openPanel(); }, 140);
 
   // Boot
   async function boot(){
@@ -279,5 +397,10 @@
     }
   }
 
+  // Offline cache + delta updates for returning visitors (see sw.js)
+  if ('serviceWorker' in navigator) {
+    window.addEventListener('load', () => { navigator.serviceWorker.register('./sw.js').catch(()=>{}); });
+  }
+
   boot();
 })();
@@ -0,0 +1,181 @@
+// sw.js — Offline cache for the app shell and catalog, kept fresh via build deltas
+
+const SHELL_CACHE = 'lkp-shell-v1';
+const DATA_CACHE = 'lkp-data-v1';
+const SHELL = ['./', './index.html', './styles.css', './theme.css', './app.js', './assets/icon.svg', './assets/logo-full.svg'];
+const BOOK = new URL('./songbook.json', self.location).href;
+const INDEX = new URL('./search_index.json', self.location).href;
+const LATEST = new URL('./deltas/latest.json', self.location).href;
+const DELTAS = new URL('./deltas/', self.location).href;
+
+// Weak signal tends to stall rather than fail: small requests give up after this
+const NETWORK_TIMEOUT_MS = 3000;
+
+// Optional timeout covers the whole request, body included
+async function fetchJson(url, timeoutMs) {
+  const ctrl = new AbortController();
+  const t = timeoutMs ? setTimeout(() => ctrl.abort(), timeoutMs) : 0;
+  try {
+    const r = await fetch(url, { cache: 'no-store', signal: ctrl.signal });
+    if (!r.ok) throw new Error('HTTP ' + r.status);
+    return await r.json();
+  } finally { clearTimeout(t); }
+}
+function withTimeout(promise, ms) {
+  return new Promise((resolve, reject) => {
+    const t = setTimeout(() => reject(new Error('Timed out')), ms);
+    promise.then((v) => { clearTimeout(t); resolve(v); }, (e) => { clearTimeout(t); reject(e); });
+  });
+}
+async function readJson(cache, url) { const r = await cache.match(url); return r ? r.json() : null; }
+function jsonResponse(obj) { return new Response(JSON.stringify(obj), { headers: { 'Content-Type': 'application/json' } }); }
+
+// Apply an ordered-list diff: drop removed and upserted keys, then insert
+// upserted items at their final positions in ascending order
+function applyOrdered(items, diff, key) {
+  const upserted = diff.upserted || [];
+  const drop = new Set([...(diff.removed || []), ...upserted.map((u) => u.item[key])]);
+  const out = (items || []).filter((it) => !drop.has(it[key]));
+  for (const u of upserted.slice().sort((x, y) => x.at - y.at)) out.splice(u.at, 0, u.item);
+  return out;
+}
+
+// Apply one side of a build delta (ordered songs diff by id + top-level patch)
+function applyDelta(doc, diff, patch) {
+  const out = Object.assign({}, doc);
+  for (const [k, v] of Object.entries(patch || {})) { if (v === null) delete out[k]; else out[k] = v; }
+  out.songs = applyOrdered(doc.songs, diff, 'id');
+  return out;
+}
+
+// Rebuild the all_songs layout from a per-artist diff; rows are cumulative
+function applyLayout(layout, diff) {
+  const prev = ((layout && layout.chunks) || []).map((c) => ({ artist: c.artist, songs: c.songs }));
+  const chunks = applyOrdered(prev, diff, 'artist').map((c) => ({ artist: c.artist, songs: c.songs }));
+  let row = 0;
+  for (const c of chunks) { c.row = row; row += 1 + c.songs.length; }
+  return { rows: row, chunks };
+}
+
+async function store(cache, book, index) {
+  await Promise.all([cache.put(BOOK, jsonResponse(book)), cache.put(INDEX, jsonResponse(index))]);
+}
+
+// The cached pair is only usable when both files carry the same version
+async function readCatalog(cache) {
+  const [book, index] = await Promise.all([readJson(cache, BOOK), readJson(cache, INDEX)]);
+  const bookVersion = book ? (book.meta || {}).data_version : null;
+  const have = bookVersion && index && index.data_version === bookVersion ? bookVersion : null;
+  return { book, index, have };
+}
+
+// Bring the cached catalog up to the published version: no-op when current
+// or offline, apply a delta when one exists, otherwise download in full
+async function doSync() {
+  const cache = await caches.open(DATA_CACHE);
+  const { book, index, have } = await readCatalog(cache);
+  let latest = null;
+  try {
+    latest = (await fetchJson(LATEST, NETWORK_TIMEOUT_MS)).version || null;
+  } catch (e) {
+    // An HTTP error means no deltas are published (full download below);
+    // anything else (offline, timed out) keeps the cache as it is
+    const offline = !(e instanceof Error && /^HTTP /.test(e.message));
+    if (offline) { if (have) return; throw new Error('Offline without a cached catalog'); }
+  }
+  if (have && latest && have === latest) return;
+  if (have && latest) {
+    try {
+      const delta = await fetchJson(DELTAS + encodeURIComponent(have) + '.json', NETWORK_TIMEOUT_MS);
+      if (delta.from === have && delta.to === latest) {
+        const patch = delta.patch || {};
+        const nextBook = applyDelta(book, delta.songs || {}, patch.songbook);
+        if (delta.artists) nextBook.artists = applyOrdered(book.artists, delta.artists, 'id');
+        if (delta.layout) nextBook.all_songs = applyLayout(book.all_songs, delta.layout);
+        await store(cache, nextBook, applyDelta(index, delta.index || {}, patch.index));
+        return;
+      }
+    } catch {}
+  }
+  const [fullBook, fullIndex] = await Promise.all([fetchJson(BOOK), fetchJson(INDEX)]);
+  await store(cache, fullBook, fullIndex);
+}
+
+// Deduplicate the parallel songbook/search_index requests of one launch
+let syncing = null;
+function syncCatalog() {
+  if (!syncing) syncing = doSync().finally(() => { setTimeout(() => { syncing = null; }, 10000); });
+  return syncing;
+}
+
+// One read of the cached pair per launch, so songbook and index responses
+// always come from the same version even if a sync lands in between
+let snapshot = null;
+function readSnapshot() {
+  if (!snapshot) {
+    snapshot = caches.open(DATA_CACHE).then(readCatalog);
+    setTimeout(() => { snapshot = null; }, 10000);
+  }
+  return snapshot;
+}
+
+// Cache first: a valid cached pair is served at once and refreshed in the
+// background for the next launch; without one, wait for the first sync
+async function serveCatalog(event, key) {
+  const snap = await readSnapshot();
+  if (snap.have) {
+    event.waitUntil(syncCatalog().catch(() => {}));
+    return jsonResponse(key === BOOK ? snap.book : snap.index);
+  }
+  try { await syncCatalog(); } catch {}
+  const cache = await caches.open(DATA_CACHE);
+  return (await cache.match(key)) || fetch(event.request);
+}
+
+// Network first so deploys show up immediately, but fall back to the cache
+// after NETWORK_TIMEOUT_MS instead of waiting on a stalled connection
+async function serveShell(event) {
+  const request = event.request;
+  const cache = await caches.open(SHELL_CACHE);
+  const network = fetch(request).then((r) => {
+    if (r.ok && r.type === 'basic') cache.put(request, r.clone());
+    return r;
+  });
+  event.waitUntil(network.catch(() => {}));
+  try {
+    return await withTimeout(network, NETWORK_TIMEOUT_MS);
+  } catch {
+    const hit = await cache.match(request, { ignoreSearch: true });
+    // Nothing cached: keep waiting for the network after all
+    return hit || network;
+  }
+}
+
+self.addEventListener('install', (e) => {
+  e.waitUntil(
+    caches.open(SHELL_CACHE)
+      .then((c) => c.addAll(SHELL))
+      .then(() => syncCatalog())
+      .catch(() => {})
+      .then(() => self.skipWaiting())
+  );
+});
+
+self.addEventListener('activate', (e) => {
+  e.waitUntil(
+    caches.keys()
+      .then((keys) => Promise.all(keys.filter((k) => k.startsWith('lkp-') && k !== SHELL_CACHE && k !== DATA_CACHE).map((k) => caches.delete(k))))
+      .then(() => self.clients.claim())
+  );
+});
+
+self.addEventListener('fetch', (e) => {
+  const req = e.request;
+  if (req.method !== 'GET') return;
+  const url = new URL(req.url);
+  if (url.origin !== self.location.origin) return;
+  const key = url.origin + url.pathname;
+  if (key === BOOK || key === INDEX) { e.respondWith(serveCatalog(e, key)); return; }
+  if (key.startsWith(DELTAS)) return;
+  e.respondWith(serveShell(e));
+});